@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 import os
 
 
@@ -13,16 +14,21 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = False
+    workers: int = 1
 
     # Security
     api_key: Optional[str] = None
     secret_key: str = "your-secret-key-change-in-production"
+    cors_origins: List[str] = []
 
     # Semgrep config
     semgrep_timeout: int = 300
     semgrep_max_memory: int = 4096
+    max_concurrent_scans: int = 4
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     max_files_per_request: int = 50
+    semgrep_cache_dir: str = ".semgrep-cache"
+    scan_cache_size: int = 256
 
     # Logging
     log_level: str = "INFO"
@@ -30,6 +36,9 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+        # Settings never change after startup; freezing skips assignment
+        # validation and lets instances be shared safely
+        frozen = True
 
 
 # Environment-specific configs
@@ -45,6 +54,7 @@ class ProductionConfig(Settings):
     log_level: str = "WARNING"
 
 
+@lru_cache(maxsize=1)
 def get_settings():
     env = os.getenv("ENVIRONMENT", "development")
 
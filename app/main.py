@@ -1,48 +1,148 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Depends
+from fastapi import FastAPI, HTTPException, File, Request, UploadFile, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
+import hashlib
+import orjson
 import time
 import logging
 import os
-import yaml
-from typing import List, Optional
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from app.config import get_settings
 from app.models import ScanRequest, ScanResult, BulkScanRequest, HealthCheck
+from app.services import buffer_pool, rules_cache
 from app.services.semgrep_service import semgrep_service
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Recognized rule-file extensions; one splitext + hash lookup per entry
+# instead of repeated str.endswith calls
+_YAML_EXTS = frozenset({".yml", ".yaml"})
+
+# Popular/recommended configs are fixed; keep them as module-level tuples so
+# handlers don't rebuild the same lists on every request
+_POPULAR_CONFIGS = (
+    "auto",
+    "p/security-audit",
+    "p/owasp-top-ten",
+    "p/cwe-top-25",
+    "p/python",
+    "p/javascript",
+    "p/typescript",
+    "p/java",
+    "p/go",
+    "p/php",
+    "p/ruby",
+    "p/c",
+    "p/cpp",
+    "p/csharp"
+)
+_RECOMMENDED_SECURITY = ("p/security-audit", "p/owasp-top-ten", "p/cwe-top-25")
+_RECOMMENDED_LANGUAGES = ("p/python", "p/javascript", "p/java", "p/go")
+_RECOMMENDED_FRAMEWORKS = (
+    "r/python.django.security",
+    "r/python.flask.security",
+    "r/javascript.express.security"
+)
+
+# Registry listing cache: successes are reused for a few minutes, failures
+# back off briefly so /rules doesn't re-probe a broken registry per request
+_REGISTRY_TTL = 300.0
+_REGISTRY_ERROR_BACKOFF = 30.0
+_registry_cache = {"expires": 0.0, "value": None, "error_backoff_until": 0.0}
+
+# Serialized /rules response, reused while both of its inputs (the custom
+# rules directory and the registry cache entry) are unchanged, so cached
+# hits skip the dict assembly and orjson encode entirely
+_rules_body_cache = {"key": None, "body": b"", "etag": ""}
+
+@lru_cache(maxsize=1)
+def _list_rule_files(directory: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Sorted YAML rule-file names, cached until the directory mtime changes"""
+    return tuple(sorted(name for name, _, _ in rules_cache.snapshot(directory)))
+
+
+@lru_cache(maxsize=1)
+def _custom_rule_listing(directory: str, mtime_ns: int) -> Tuple[Tuple[dict, ...], Tuple[str, ...]]:
+    """Custom-rule listing for /rules plus the derived recommended paths,
+    cached until the directory mtime changes."""
+    rules = tuple(
+        {"name": name, "path": f"{directory}/{name}", "size": stat.st_size}
+        for name, _, stat in rules_cache.snapshot(directory)
+    )
+    return rules, tuple(rule["path"] for rule in rules)
+
 
 # Get settings
 settings = get_settings()
 
+# Bind the hot request limits as plain ints; pydantic attribute access goes
+# through descriptors and these are consulted on every scan request
+MAX_FILES = int(settings.max_files_per_request)
+MAX_FILE_SIZE = int(settings.max_file_size)
+
+# Setup logging at the configured level, resolved to an int once so
+# isEnabledFor checks are plain integer comparisons
+_LOG_LEVEL = logging.getLevelName(settings.log_level.upper())
+if not isinstance(_LOG_LEVEL, int):
+    _LOG_LEVEL = logging.INFO
+logging.basicConfig(level=_LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
 # Create FastAPI app
 app = FastAPI(
     title="Semgrep API",
     version="2.0.0",
     description="Production-ready Semgrep code security scanning API",
     docs_url="/docs" if settings.debug else None,
+    default_response_class=ORJSONResponse,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware. A wildcard origin combined with credentials is a spec
+# violation (browsers ignore it), so credentials are only allowed with an
+# explicit allowlist. Without an allowlist the middleware is only mounted in
+# debug, so production API traffic skips the extra per-request hop entirely.
+if settings.cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+elif settings.debug:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+
+@app.on_event("startup")
+async def warm_semgrep_caches():
+    # Fire-and-forget so startup isn't blocked while the registry pull and
+    # first rule compile happen; early requests just run concurrently
+    asyncio.create_task(semgrep_service.warm_up())
 
 
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request, call_next):
-    start_time = time.time()
+    # Monotonic high-resolution clock: immune to NTP steps and cheaper
+    # than time.time()
+    start_time = time.perf_counter_ns()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    process_time = (time.perf_counter_ns() - start_time) / 1e9
+    response.headers["X-Process-Time"] = f"{process_time:.6f}"
+    # %-style args are only formatted if a handler actually consumes the
+    # record, so a filtered INFO level costs just the isEnabledFor check
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%s %s -> %d in %.4fs",
+            request.method, request.url.path, response.status_code, process_time
+        )
     return response
 
 
@@ -50,20 +150,25 @@ async def log_requests(request, call_next):
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc: Exception):
     logger.error(f"Global exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"message": "Internal server error", "detail": str(exc)}
     )
 
 
 # Root endpoint
+# The root payload is fully static once settings are loaded; serialize it at
+# import so the handler just hands back prebuilt bytes
+_ROOT_BODY = orjson.dumps({
+    "message": "Semgrep API v2.0.0",
+    "docs": "/docs" if settings.debug else "disabled",
+    "endpoints": ["/scan", "/scan/bulk", "/scan/upload", "/health", "/rules"]
+})
+
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Semgrep API v2.0.0",
-        "docs": "/docs" if settings.debug else "disabled",
-        "endpoints": ["/scan", "/scan/bulk", "/scan/upload", "/health", "/rules"]
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 # Health check
@@ -87,10 +192,9 @@ async def health_check():
 async def scan_code(request: ScanRequest):
     """Scan a single code snippet"""
     try:
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = await semgrep_service.scan_code(request)
-        result.execution_time = time.time() - start_time
-        return result
+        return _scan_response(result, start_time)
     except Exception as e:
         logger.error(f"Scan failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -101,13 +205,12 @@ async def scan_code(request: ScanRequest):
 async def bulk_scan(request: BulkScanRequest):
     """Scan multiple files"""
     try:
-        if len(request.files) > settings.max_files_per_request:
-            raise HTTPException(status_code=400, detail=f"Too many files. Max: {settings.max_files_per_request}")
+        if len(request.files) > MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Too many files. Max: {MAX_FILES}")
 
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = await semgrep_service.scan_multiple_files(request.files, request.config)
-        result.execution_time = time.time() - start_time
-        return result
+        return _scan_response(result, start_time)
     except Exception as e:
         logger.error(f"Bulk scan failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -118,171 +221,229 @@ async def bulk_scan(request: BulkScanRequest):
 async def upload_scan(files: List[UploadFile] = File(...), config: Optional[str] = None):
     """Upload and scan files"""
     try:
-        if len(files) > settings.max_files_per_request:
-            raise HTTPException(status_code=400, detail=f"Too many files. Max: {settings.max_files_per_request}")
+        if len(files) > MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Too many files. Max: {MAX_FILES}")
 
         file_data = []
         for file in files:
-            if file.size and file.size > settings.max_file_size:
-                raise HTTPException(status_code=400, detail=f"File {file.filename} too large")
-
-            content = await file.read()
-            file_data.append({
-                "filename": file.filename,
-                "content": content.decode('utf-8', errors='ignore')
-            })
-
-        start_time = time.time()
+            if file.size and file.size > MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail=f"File {file.filename} too large")
+
+            # Stream in bounded chunks into a pooled buffer instead of
+            # reading the whole body at once; the declared size can be
+            # absent or wrong, so enforce the cap on the bytes actually
+            # received and fail fast on overflow. Keep raw bytes; semgrep
+            # reads the temp file from disk, so a decode/re-encode
+            # round-trip would just copy the payload twice
+            buf = buffer_pool.acquire()
+            try:
+                # Pooled buffers keep their old contents (clearing would
+                # free their capacity), so overwrite in place and track the
+                # fill length explicitly
+                total = 0
+                while chunk := await file.read(64 * 1024):
+                    new_total = total + len(chunk)
+                    if new_total > MAX_FILE_SIZE:
+                        raise HTTPException(status_code=413, detail=f"File {file.filename} too large")
+                    buf[total:new_total] = chunk
+                    total = new_total
+
+                file_data.append({
+                    "filename": file.filename,
+                    "content": bytes(memoryview(buf)[:total])
+                })
+            finally:
+                buffer_pool.release(buf)
+
+        start_time = time.perf_counter_ns()
         result = await semgrep_service.scan_multiple_files(file_data, config)
-        result.execution_time = time.time() - start_time
-        return result
+        return _scan_response(result, start_time)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload scan failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _scan_response(result: ScanResult, start_time: int) -> Response:
+    """Serialize a ScanResult straight to response bytes.
+
+    Returning a prebuilt Response skips FastAPI's response_model
+    re-validation and the jsonable_encoder walk over every finding dict;
+    the handlers keep response_model=ScanResult for the OpenAPI schema.
+    """
+    result.execution_time = (time.perf_counter_ns() - start_time) / 1e9
+    return Response(
+        content=result.model_dump_json().encode(),
+        media_type="application/json",
+    )
+
+
+def _etag_of(body: bytes) -> str:
+    """Cheap strong ETag over prebuilt response bytes"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
 # Rules endpoints
 @app.get("/rules")
-async def get_rules():
+async def get_rules(request: Request):
     """Get available Semgrep rules and configurations"""
     try:
-        # Get popular/recommended configs
-        popular_configs = [
-            "auto",
-            "p/security-audit",
-            "p/owasp-top-ten",
-            "p/cwe-top-25",
-            "p/python",
-            "p/javascript",
-            "p/typescript",
-            "p/java",
-            "p/go",
-            "p/php",
-            "p/ruby",
-            "p/c",
-            "p/cpp",
-            "p/csharp"
-        ]
-
-        # Get custom rules from filesystem
-        custom_rules = []
+        # Get custom rules from filesystem (cached on directory mtime)
+        custom_rules = ()
+        recommended_custom = ()
         custom_rules_dir = "rules/custom"
 
-        if os.path.exists(custom_rules_dir):
-            for file in os.listdir(custom_rules_dir):
-                if file.endswith(('.yml', '.yaml')):
-                    rule_path = f"{custom_rules_dir}/{file}"
-                    custom_rules.append({
-                        "name": file,
-                        "path": rule_path,
-                        "size": os.path.getsize(rule_path) if os.path.exists(rule_path) else 0
-                    })
-
-        # Try to get registry rules (with fallback)
-        registry_rules = []
         try:
-            registry_rules = await semgrep_service.get_available_rules()
-        except Exception as e:
-            logger.warning(f"Could not fetch registry rules: {e}")
-            # Fallback to known popular rules
-            registry_rules = popular_configs[:10]  # First 10 as sample
+            dir_mtime_ns = os.stat(custom_rules_dir).st_mtime_ns
+        except OSError:
+            dir_mtime_ns = None
+
+        if dir_mtime_ns is not None:
+            custom_rules, recommended_custom = _custom_rule_listing(custom_rules_dir, dir_mtime_ns)
+
+        # Try to get registry rules (cached, with fallback)
+        now = time.monotonic()
+        if _registry_cache["value"] is not None and now < _registry_cache["expires"]:
+            registry_rules = _registry_cache["value"]
+        elif now < _registry_cache["error_backoff_until"]:
+            # Registry recently failed; don't re-probe yet
+            registry_rules = list(_POPULAR_CONFIGS[:10])
+        else:
+            try:
+                registry_rules = await semgrep_service.get_available_rules()
+                _registry_cache["value"] = registry_rules
+                _registry_cache["expires"] = now + _REGISTRY_TTL
+            except Exception as e:
+                logger.warning(f"Could not fetch registry rules: {e}")
+                _registry_cache["error_backoff_until"] = now + _REGISTRY_ERROR_BACKOFF
+                # Fallback to known popular rules
+                registry_rules = list(_POPULAR_CONFIGS[:10])  # First 10 as sample
+
+        # Both inputs are themselves cached (directory mtime, registry TTL),
+        # so while neither moves the previously serialized body is still valid
+        cache_key = (
+            dir_mtime_ns,
+            _registry_cache["expires"],
+            _registry_cache["error_backoff_until"],
+        )
+        if _rules_body_cache["key"] == cache_key:
+            body = _rules_body_cache["body"]
+            etag = _rules_body_cache["etag"]
+        else:
+            body = orjson.dumps({
+                "status": "success",
+                "popular_configs": _POPULAR_CONFIGS,
+                "custom_rules": custom_rules,
+                "registry_rules": registry_rules[:20] if registry_rules else [],
+                "total_custom": len(custom_rules),
+                "total_registry": len(registry_rules) if registry_rules else 0,
+                "recommended": {
+                    "security": _RECOMMENDED_SECURITY,
+                    "languages": _RECOMMENDED_LANGUAGES,
+                    "frameworks": _RECOMMENDED_FRAMEWORKS,
+                    "custom": recommended_custom
+                }
+            })
+            etag = _etag_of(body)
+            _rules_body_cache["key"] = cache_key
+            _rules_body_cache["body"] = body
+            _rules_body_cache["etag"] = etag
 
-        return {
-            "status": "success",
-            "popular_configs": popular_configs,
-            "custom_rules": custom_rules,
-            "registry_rules": registry_rules[:20] if registry_rules else [],
-            "total_custom": len(custom_rules),
-            "total_registry": len(registry_rules) if registry_rules else 0,
-            "recommended": {
-                "security": ["p/security-audit", "p/owasp-top-ten", "p/cwe-top-25"],
-                "languages": ["p/python", "p/javascript", "p/java", "p/go"],
-                "frameworks": [
-                    "r/python.django.security",
-                    "r/python.flask.security",
-                    "r/javascript.express.security"
-                ],
-                "custom": [rule["path"] for rule in custom_rules]
-            }
-        }
+        # Dashboards poll this endpoint; let unchanged payloads short-circuit
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
     except Exception as e:
         logger.error(f"Failed to get rules: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve rules: {str(e)}")
 
 
-@app.get("/rules/popular")
-async def get_popular_rules():
-    """Get popular/recommended rule configurations"""
-    return {
-        "status": "success",
-        "popular_rules": {
-            "security_focused": [
-                {
-                    "config": "p/security-audit",
-                    "description": "Comprehensive security audit rules",
-                    "languages": ["python", "javascript", "java", "go", "php", "ruby"],
-                    "recommended_for": "General security scanning"
-                },
-                {
-                    "config": "p/owasp-top-ten",
-                    "description": "OWASP Top 10 vulnerability patterns",
-                    "languages": ["python", "javascript", "java", "php"],
-                    "recommended_for": "Web application security"
-                },
-                {
-                    "config": "p/cwe-top-25",
-                    "description": "CWE Top 25 most dangerous software errors",
-                    "languages": ["python", "javascript", "java", "c", "cpp"],
-                    "recommended_for": "Critical vulnerability detection"
-                }
-            ],
-            "language_specific": [
-                {
-                    "config": "p/python",
-                    "description": "Python-specific security and quality rules",
-                    "languages": ["python"],
-                    "recommended_for": "Python applications"
-                },
-                {
-                    "config": "p/javascript",
-                    "description": "JavaScript/Node.js security rules",
-                    "languages": ["javascript", "typescript"],
-                    "recommended_for": "JavaScript applications"
-                },
-                {
-                    "config": "p/java",
-                    "description": "Java security and quality rules",
-                    "languages": ["java"],
-                    "recommended_for": "Java applications"
-                }
-            ],
-            "framework_specific": [
-                {
-                    "config": "r/python.django.security",
-                    "description": "Django framework security rules",
-                    "languages": ["python"],
-                    "recommended_for": "Django web applications"
-                },
-                {
-                    "config": "r/javascript.express.security",
-                    "description": "Express.js security rules",
-                    "languages": ["javascript"],
-                    "recommended_for": "Express.js applications"
-                }
-            ]
-        },
-        "usage_examples": {
-            "auto_detection": {
-                "config": "auto",
-                "description": "Automatically select appropriate rules based on detected languages"
+# Static /rules/popular payload, built and serialized once at import so the
+# handler returns prebuilt bytes instead of re-encoding the dict per request
+_POPULAR_RULES_BODY = orjson.dumps({
+    "status": "success",
+    "popular_rules": {
+        "security_focused": [
+            {
+                "config": "p/security-audit",
+                "description": "Comprehensive security audit rules",
+                "languages": ["python", "javascript", "java", "go", "php", "ruby"],
+                "recommended_for": "General security scanning"
+            },
+            {
+                "config": "p/owasp-top-ten",
+                "description": "OWASP Top 10 vulnerability patterns",
+                "languages": ["python", "javascript", "java", "php"],
+                "recommended_for": "Web application security"
+            },
+            {
+                "config": "p/cwe-top-25",
+                "description": "CWE Top 25 most dangerous software errors",
+                "languages": ["python", "javascript", "java", "c", "cpp"],
+                "recommended_for": "Critical vulnerability detection"
+            }
+        ],
+        "language_specific": [
+            {
+                "config": "p/python",
+                "description": "Python-specific security and quality rules",
+                "languages": ["python"],
+                "recommended_for": "Python applications"
+            },
+            {
+                "config": "p/javascript",
+                "description": "JavaScript/Node.js security rules",
+                "languages": ["javascript", "typescript"],
+                "recommended_for": "JavaScript applications"
             },
-            "custom_rules": {
-                "config": "rules/custom/security-essentials.yml",
-                "description": "Use custom security rules created during deployment"
+            {
+                "config": "p/java",
+                "description": "Java security and quality rules",
+                "languages": ["java"],
+                "recommended_for": "Java applications"
             }
+        ],
+        "framework_specific": [
+            {
+                "config": "r/python.django.security",
+                "description": "Django framework security rules",
+                "languages": ["python"],
+                "recommended_for": "Django web applications"
+            },
+            {
+                "config": "r/javascript.express.security",
+                "description": "Express.js security rules",
+                "languages": ["javascript"],
+                "recommended_for": "Express.js applications"
+            }
+        ]
+    },
+    "usage_examples": {
+        "auto_detection": {
+            "config": "auto",
+            "description": "Automatically select appropriate rules based on detected languages"
+        },
+        "custom_rules": {
+            "config": "rules/custom/security-essentials.yml",
+            "description": "Use custom security rules created during deployment"
         }
     }
+})
+_POPULAR_RULES_ETAG = _etag_of(_POPULAR_RULES_BODY)
+
+
+@app.get("/rules/popular")
+async def get_popular_rules(request: Request):
+    """Get popular/recommended rule configurations"""
+    if request.headers.get("if-none-match") == _POPULAR_RULES_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_POPULAR_RULES_BODY,
+        media_type="application/json",
+        headers={"ETag": _POPULAR_RULES_ETAG}
+    )
 
 
 @app.get("/rules/custom")
@@ -299,39 +460,24 @@ async def get_custom_rules():
                 "message": "No custom rules directory found"
             }
 
-        for file in os.listdir(custom_rules_dir):
-            if file.endswith(('.yml', '.yaml')):
-                rule_path = os.path.join(custom_rules_dir, file)
-
-                try:
-                    # Read rule file content
-                    with open(rule_path, 'r') as f:
-                        content = f.read()
-
-                    # Parse YAML to count rules
-                    rule_data = yaml.safe_load(content)
-                    rule_count = len(rule_data.get('rules', [])) if rule_data else 0
-
-                    # Get rule IDs
-                    rule_ids = []
-                    if rule_data and 'rules' in rule_data:
-                        rule_ids = [rule.get('id', 'unknown') for rule in rule_data['rules']]
-
-                    custom_rules.append({
-                        "filename": file,
-                        "path": f"rules/custom/{file}",
-                        "size": os.path.getsize(rule_path),
-                        "rule_count": rule_count,
-                        "rule_ids": rule_ids,
-                        "modified": os.path.getmtime(rule_path)
-                    })
-
-                except Exception as e:
-                    custom_rules.append({
-                        "filename": file,
-                        "path": f"rules/custom/{file}",
-                        "error": f"Failed to parse: {str(e)}"
-                    })
+        # Listing only needs counts; rule ids are served by the per-file
+        # detail endpoint, which pays for the full parse on demand
+        for name, path, stat in rules_cache.snapshot(custom_rules_dir):
+            try:
+                custom_rules.append({
+                    "filename": name,
+                    "path": f"rules/custom/{name}",
+                    "size": stat.st_size,
+                    "rule_count": rules_cache.rule_count(path, stat),
+                    "modified": stat.st_mtime
+                })
+
+            except Exception as e:
+                custom_rules.append({
+                    "filename": name,
+                    "path": f"rules/custom/{name}",
+                    "error": f"Failed to parse: {str(e)}"
+                })
 
         return {
             "status": "success",
@@ -345,74 +491,107 @@ async def get_custom_rules():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/rules/custom/{filename}")
+async def get_custom_rule_detail(filename: str):
+    """Get full details, including rule ids, for one custom rule file"""
+    # Only bare YAML filenames are valid; anything else can't be a rule file
+    if filename != os.path.basename(filename) or os.path.splitext(filename)[1] not in _YAML_EXTS:
+        raise HTTPException(status_code=404, detail=f"Rule file {filename} not found")
+
+    rule_path = os.path.join("rules/custom", filename)
+    try:
+        stat = os.stat(rule_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail=f"Rule file {filename} not found")
+
+    try:
+        info = await rules_cache.parsed_rules_async(rule_path, stat)
+    except Exception as e:
+        logger.error(f"Failed to parse custom rule {filename}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to parse: {str(e)}")
+
+    return {
+        "status": "success",
+        "filename": filename,
+        "path": f"rules/custom/{filename}",
+        **info
+    }
+
+
 @app.get("/rules/test")
 async def test_rules():
     """Test if rules are working properly"""
     try:
-        test_results = {}
-
-        # Test popular configs
+        # Collect everything to test: popular configs plus custom rule files.
+        # Validate each payload once and model_copy it per config, which
+        # skips re-running field validators on the unchanged fields.
         popular_configs = ["auto", "p/security-audit", "p/python"]
 
-        for config in popular_configs:
-            try:
-                # Create a simple test request
-                test_request = ScanRequest(
-                    code="import os\nos.system('ls')",
-                    language="python",
-                    config=config
-                )
+        base_request = ScanRequest(
+            code="import os\nos.system('ls')",
+            language="python",
+            config="auto"
+        )
+        custom_base = ScanRequest(
+            code="password = 'admin123'\nos.system('ls')",
+            language="python",
+            config="auto"
+        )
 
-                # Run scan
-                result = await semgrep_service.scan_code(test_request)
+        targets = [
+            (config, base_request.model_copy(update={"config": config}))
+            for config in popular_configs
+        ]
 
-                test_results[config] = {
+        custom_rules_dir = "rules/custom"
+        try:
+            dir_mtime_ns = os.stat(custom_rules_dir).st_mtime_ns
+        except OSError:
+            dir_mtime_ns = None
+
+        if dir_mtime_ns is not None:
+            for name in _list_rule_files(custom_rules_dir, dir_mtime_ns):
+                targets.append((f"custom/{name}", custom_base.model_copy(
+                    update={"config": f"{custom_rules_dir}/{name}"}
+                )))
+
+        # Scans are independent and subprocess-bound, so run them
+        # concurrently but cap how many semgrep processes are in flight
+        semaphore = asyncio.Semaphore(settings.max_concurrent_scans)
+
+        async def run_scan(request: ScanRequest) -> ScanResult:
+            async with semaphore:
+                return await semgrep_service.scan_code(request)
+
+        results = await asyncio.gather(
+            *(run_scan(request) for _, request in targets),
+            return_exceptions=True
+        )
+
+        test_results = {}
+        for (name, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                test_results[name] = {
+                    "status": "error",
+                    "error": str(result)
+                }
+            else:
+                test_results[name] = {
                     "status": "working",
                     "findings_count": len(result.findings),
                     "has_findings": len(result.findings) > 0,
                     "errors": result.errors
                 }
 
-            except Exception as e:
-                test_results[config] = {
-                    "status": "error",
-                    "error": str(e)
-                }
-
-        # Test custom rules
-        custom_rules_dir = "rules/custom"
-        if os.path.exists(custom_rules_dir):
-            for file in os.listdir(custom_rules_dir):
-                if file.endswith(('.yml', '.yaml')):
-                    rule_path = f"{custom_rules_dir}/{file}"
-                    try:
-                        test_request = ScanRequest(
-                            code="password = 'admin123'\nos.system('ls')",
-                            language="python",
-                            config=rule_path
-                        )
-
-                        result = await semgrep_service.scan_code(test_request)
-
-                        test_results[f"custom/{file}"] = {
-                            "status": "working",
-                            "findings_count": len(result.findings),
-                            "has_findings": len(result.findings) > 0
-                        }
-
-                    except Exception as e:
-                        test_results[f"custom/{file}"] = {
-                            "status": "error",
-                            "error": str(e)
-                        }
+        status_counts = Counter(r.get("status") for r in test_results.values())
 
         return {
             "status": "success",
             "test_results": test_results,
             "summary": {
                 "total_tested": len(test_results),
-                "working": len([r for r in test_results.values() if r.get("status") == "working"]),
-                "errors": len([r for r in test_results.values() if r.get("status") == "error"])
+                "working": status_counts["working"],
+                "errors": status_counts["error"]
             }
         }
 
@@ -424,4 +603,17 @@ async def test_rules():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("app.main:app", host=settings.host, port=settings.port, reload=settings.reload)
\ No newline at end of file
+    if settings.reload:
+        # Reload mode is incompatible with uvloop/workers; keep the defaults
+        uvicorn.run("app.main:app", host=settings.host, port=settings.port, reload=True)
+    else:
+        # uvloop and httptools ship with uvicorn[standard]: libuv-backed
+        # event loop and a C HTTP parser instead of asyncio + h11
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            loop="uvloop",
+            http="httptools",
+            workers=settings.workers
+        )
\ No newline at end of file
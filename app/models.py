@@ -9,6 +9,15 @@ class SeverityLevel(str, Enum):
     ERROR = "ERROR"
 
 
+# Shared validator constants, hoisted so per-request validation doesn't
+# rebuild the language set or recompute the size cap
+_SUPPORTED_LANGUAGES = frozenset({
+    'python', 'javascript', 'typescript', 'java', 'go', 'php',
+    'ruby', 'c', 'cpp', 'csharp', 'kotlin', 'rust', 'scala', 'swift', 'auto'
+})
+_MAX_CONTENT_SIZE = 10 * 1024 * 1024  # 10MB
+
+
 class ScanRequest(BaseModel):
     model_config = ConfigDict(
         json_schema_extra={
@@ -28,12 +37,8 @@ class ScanRequest(BaseModel):
     @field_validator('language')
     @classmethod
     def validate_language(cls, v):
-        supported_languages = {
-            'python', 'javascript', 'typescript', 'java', 'go', 'php',
-            'ruby', 'c', 'cpp', 'csharp', 'kotlin', 'rust', 'scala', 'swift', 'auto'
-        }
-        if v.lower() not in supported_languages:
-            raise ValueError(f"Language '{v}' not supported. Supported: {', '.join(supported_languages)}")
+        if v.lower() not in _SUPPORTED_LANGUAGES:
+            raise ValueError(f"Language '{v}' not supported. Supported: {', '.join(sorted(_SUPPORTED_LANGUAGES))}")
         return v.lower()
 
 
@@ -67,7 +72,7 @@ class BulkScanRequest(BaseModel):
                 raise ValueError(f"File {i}: Each file must have 'filename' and 'content' fields")
             if not file_data['filename'].strip():
                 raise ValueError(f"File {i}: filename cannot be empty")
-            if len(file_data['content']) > 10 * 1024 * 1024:  # 10MB
+            if len(file_data['content']) > _MAX_CONTENT_SIZE:
                 raise ValueError(f"File {file_data['filename']}: content too large (max 10MB)")
         return v
 
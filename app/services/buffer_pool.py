@@ -0,0 +1,32 @@
+import queue
+
+# Reusable byte buffers for upload streaming. Streaming each upload into a
+# pooled bytearray avoids allocating (and GC-ing) one large buffer per file
+# on every request. Buffers are pooled without being cleared — clear() would
+# release the backing allocation and defeat the reuse — so a buffer may still
+# hold bytes from its previous use and callers must track their own fill
+# length, overwriting in place. The pool is a small bounded LIFO so recently
+# used, still cache-warm buffers are handed out first; when it's empty or
+# full, acquire/release degrade to plain allocation.
+_POOL_SIZE = 8
+_pool: "queue.LifoQueue[bytearray]" = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+
+def acquire() -> bytearray:
+    """Get a buffer from the pool, or a fresh one if none is free.
+
+    The buffer keeps whatever capacity (and stale contents) its last user
+    left it with; only read back the bytes you wrote.
+    """
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return bytearray()
+
+
+def release(buf: bytearray) -> None:
+    """Return a buffer to the pool; drop it if the pool is full"""
+    try:
+        _pool.put_nowait(buf)
+    except queue.Full:
+        pass
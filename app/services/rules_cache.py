@@ -0,0 +1,258 @@
+import asyncio
+import atexit
+import os
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Prefer the libyaml-backed loader (~10x faster); fall back to pure Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Recognized rule-file extensions
+_YAML_EXTS = frozenset({".yml", ".yaml"})
+
+# Parsed custom-rule metadata keyed by path, invalidated when the file's
+# (mtime, size) stat signature changes. Bounded FIFO so a churning rules
+# directory can't grow the cache without limit.
+_MAX_ENTRIES = 64
+_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def iter_rule_files(directory: str):
+    """Yield (name, path, stat) for each YAML rule file in one scandir pass"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if os.path.splitext(entry.name)[1] in _YAML_EXTS and entry.is_file(follow_symlinks=False):
+                yield entry.name, entry.path, entry.stat()
+
+
+# Directory snapshots keyed by path: (dir st_mtime_ns, entries tuple). The
+# directory inode's mtime only moves on create/delete/rename, so a single
+# stat decides whether the cached entries are still valid.
+_DIR_STATE: dict = {}
+
+
+def snapshot(directory: str) -> tuple:
+    """Cached (name, path, stat) entries for a rules directory.
+
+    Rebuilt only when the directory's mtime changes; a missing directory
+    yields an empty tuple.
+    """
+    try:
+        dir_mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return ()
+
+    cached = _DIR_STATE.get(directory)
+    if cached and cached[0] == dir_mtime_ns:
+        return cached[1]
+
+    entries = tuple(iter_rule_files(directory))
+    _DIR_STATE[directory] = (dir_mtime_ns, entries)
+    return entries
+
+
+def _read_bytes(path: str, size: int) -> bytes:
+    """Read a whole file with raw os calls.
+
+    Skips the io.TextIOWrapper/BufferedReader layers entirely; the stat from
+    the directory snapshot already tells us the size, so the common case is
+    one os.read for the full content. libyaml accepts bytes directly, so no
+    decode round-trip is needed either.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, size) if size > 0 else b""
+        # Always drain to EOF: os.read may return short, and the file may
+        # have changed size since the stat
+        while chunk := os.read(fd, 65536):
+            data += chunk
+        return data
+    finally:
+        os.close(fd)
+
+
+def _stream_rule_ids(content) -> Optional[List[str]]:
+    """Collect rule ids from a rules file using the streaming event API.
+
+    Walks parser events instead of building the full node tree, so rule
+    bodies (patterns, messages, metadata) are skipped entirely, and stops
+    as soon as the top-level `rules` sequence ends. Returns None when the
+    document has no `rules` key so the caller can fall back to a full load.
+    """
+    rule_ids = []
+    # Stack of open containers: ['map', expect_key] or ['seq']
+    stack = []
+    rules_depth = None
+    pending_rules_value = False
+    pending_id_value = False
+
+    for event in yaml.parse(content, Loader=_YAML_LOADER):
+        if isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)):
+            frame = stack[-1] if stack else None
+            if frame and frame[0] == 'map':
+                if frame[1]:
+                    # Key position
+                    value = getattr(event, 'value', None)
+                    if len(stack) == 1 and value == 'rules':
+                        pending_rules_value = True
+                    elif rules_depth is not None and len(stack) == rules_depth + 1 and value == 'id':
+                        pending_id_value = True
+                    frame[1] = False
+                else:
+                    # Value position
+                    if pending_id_value and rule_ids:
+                        rule_ids[-1] = getattr(event, 'value', 'unknown')
+                    pending_rules_value = False
+                    pending_id_value = False
+                    frame[1] = True
+        elif isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            is_mapping = isinstance(event, yaml.MappingStartEvent)
+            if pending_rules_value:
+                pending_rules_value = False
+                if not is_mapping:
+                    rules_depth = len(stack) + 1
+            pending_id_value = False
+            if is_mapping and rules_depth is not None and len(stack) == rules_depth:
+                # A new entry in the rules sequence
+                rule_ids.append('unknown')
+            stack.append(['map', True] if is_mapping else ['seq'])
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            closed_rules = rules_depth is not None and len(stack) == rules_depth
+            stack.pop()
+            if stack and stack[-1][0] == 'map':
+                stack[-1][1] = True
+            if closed_rules:
+                return rule_ids
+
+    return rule_ids if rules_depth is not None else None
+
+
+# Cheap rule counts keyed the same way as the parse cache; kept separate so
+# listing endpoints never force a full parse
+_COUNT_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+
+_COUNT_NEEDLE = b'- id:'
+_COUNT_CHUNK = 64 * 1024
+
+
+def _count_needle(path: str) -> int:
+    """Count `- id:` occurrences reading in fixed-size chunks.
+
+    readinto a reusable bytearray keeps heap churn constant regardless of
+    file size, with no utf-8 decode; a needle straddling two chunks is
+    caught by re-scanning a small carry window across the boundary.
+    """
+    count = 0
+    buf = bytearray(_COUNT_CHUNK)
+    view = memoryview(buf)
+    carry = b""
+    tail = len(_COUNT_NEEDLE) - 1
+    with open(path, 'rb', buffering=0) as f:
+        while n := f.readinto(buf):
+            count += buf.count(_COUNT_NEEDLE, 0, n)
+            if carry:
+                # The needle can't fit inside either window alone, so any
+                # hit here necessarily spans the chunk boundary. Clamp to
+                # the bytes actually read: a short final chunk must not
+                # leak stale buffer contents into the window
+                count += (carry + bytes(view[:min(tail, n)])).count(_COUNT_NEEDLE)
+            carry = bytes(view[max(0, n - tail):n])
+    return count
+
+
+def rule_count(rule_path: str, stat: os.stat_result) -> int:
+    """Count rules with a byte-level scan, cached until the file changes.
+
+    Counting `- id:` occurrences matches the heuristic used elsewhere in the
+    service and avoids building any YAML node tree; the full parse is only
+    paid when a caller actually needs the rule ids.
+    """
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _COUNT_CACHE.get(rule_path)
+    if cached and cached[0] == key:
+        _COUNT_CACHE.move_to_end(rule_path)
+        return cached[1]
+
+    count = _count_needle(rule_path)
+
+    _COUNT_CACHE[rule_path] = (key, count)
+    if len(_COUNT_CACHE) > _MAX_ENTRIES:
+        _COUNT_CACHE.popitem(last=False)
+    return count
+
+
+def _parse_rule_ids(content: bytes) -> List[str]:
+    """Extract rule ids from raw YAML bytes.
+
+    Module-level (and so picklable) because large files are parsed in the
+    shared process pool. Tries the streaming scan first and falls back to a
+    full load for odd or malformed documents.
+    """
+    try:
+        rule_ids = _stream_rule_ids(content)
+    except yaml.YAMLError:
+        rule_ids = None
+
+    if rule_ids is None:
+        rule_data = yaml.load(content, Loader=_YAML_LOADER)
+        rule_ids = []
+        if rule_data and 'rules' in rule_data:
+            rule_ids = [rule.get('id', 'unknown') for rule in rule_data['rules']]
+    return rule_ids
+
+
+# Shared process pool for CPU-bound parses, created on first use so workers
+# are only forked if a large file ever shows up. Small files parse faster
+# than a pool round-trip costs, so they stay in-process.
+_POOL_MIN_SIZE = 64 * 1024
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        atexit.register(_PARSE_POOL.shutdown, wait=False)
+    return _PARSE_POOL
+
+
+def _store_parsed(rule_path: str, key: tuple, stat: os.stat_result, rule_ids: List[str]) -> dict:
+    info = {
+        "rule_count": len(rule_ids),
+        "rule_ids": rule_ids,
+        "size": stat.st_size,
+        "modified": stat.st_mtime
+    }
+    _CACHE[rule_path] = (key, info)
+    if len(_CACHE) > _MAX_ENTRIES:
+        _CACHE.popitem(last=False)
+    return info
+
+
+async def parsed_rules_async(rule_path: str, stat: os.stat_result) -> dict:
+    """Parse a custom rule file, caching the result until the file changes.
+
+    Large files are parsed in the shared process pool: a cache miss on a
+    big rule file would otherwise hold the GIL (and the event loop) for
+    the whole parse, while offloading lets concurrent requests parse on
+    separate cores.
+    """
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(rule_path)
+    if cached and cached[0] == key:
+        _CACHE.move_to_end(rule_path)
+        return cached[1]
+
+    content = _read_bytes(rule_path, stat.st_size)
+    if stat.st_size >= _POOL_MIN_SIZE:
+        loop = asyncio.get_running_loop()
+        rule_ids = await loop.run_in_executor(_get_parse_pool(), _parse_rule_ids, content)
+    else:
+        rule_ids = _parse_rule_ids(content)
+    return _store_parsed(rule_path, key, stat, rule_ids)
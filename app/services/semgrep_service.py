@@ -1,101 +1,427 @@
 import subprocess
-import json
+import hashlib
+import shutil
 import tempfile
+from collections import OrderedDict
+from pathlib import PurePosixPath
+import time
 import os
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+
+import aiofiles
+import ijson
+from ijson.common import ObjectBuilder
 
 from app.config import get_settings
 from app.models import ScanRequest, ScanResult
+from app.services import rules_cache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class _CountingReader:
+    """Async read() passthrough that tracks how many bytes were consumed.
+
+    Lets the stream parser tell a truly empty stdout (fine, semgrep had
+    nothing to say) apart from garbage that failed before the first JSON
+    event (a real parse error that must be surfaced).
+    """
+    __slots__ = ("_stream", "bytes_read")
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.bytes_read = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        data = await self._stream.read(n)
+        self.bytes_read += len(data)
+        return data
+
+# Language -> file extension map, hoisted so hot scan paths don't rebuild
+# the dict literal on every call
+_EXTENSIONS = {
+    "python": "py",
+    "javascript": "js",
+    "typescript": "ts",
+    "java": "java",
+    "go": "go",
+    "php": "php",
+    "ruby": "rb",
+    "c": "c",
+    "cpp": "cpp",
+    "csharp": "cs",
+    "kotlin": "kt",
+    "rust": "rs",
+    "scala": "scala",
+    "swift": "swift",
+    "auto": "txt"
+}
+
+# Fallback rule listing returned when the registry can't be reached
+_FALLBACK_RULES = (
+    "auto",
+    "p/security-audit",
+    "p/owasp-top-ten",
+    "p/cwe-top-25",
+    "p/python",
+    "p/javascript",
+    "p/typescript",
+    "p/java",
+    "p/go",
+    "p/php",
+    "p/ruby",
+    "p/c",
+    "p/cpp",
+    "p/csharp",
+    "p/kotlin",
+    "p/rust",
+    "p/scala",
+    "p/swift",
+    "r/python.django.security",
+    "r/python.flask.security",
+    "r/javascript.express.security",
+    "r/javascript.node-js.security",
+    "r/java.spring.security"
+)
+
+
 class SemgrepService:
+    # Both values only change on binary upgrade / rule re-pull, but each
+    # lookup costs a fork+exec, so cache them with generous TTLs
+    _VERSION_TTL = 3600.0
+    _RULES_TTL = 60.0
+
+    # Micro-batching window for scan_code: requests arriving within this
+    # span share one semgrep invocation, so N concurrent small snippets pay
+    # one process-startup + rule-compile cost instead of N
+    _BATCH_WINDOW = 0.02
+    _BATCH_MAX = 16
+
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=4)
         self.timeout = settings.semgrep_timeout
         self.max_memory = settings.semgrep_max_memory
+        self._version_cache: Optional[tuple] = None
+        self._rules_cache: Optional[tuple] = None
+        # Single-flight guards: concurrent cache misses wait for one probe
+        # instead of each forking their own semgrep process
+        self._version_lock = asyncio.Lock()
+        self._rules_lock = asyncio.Lock()
+        # Persistent user-data folder so parsed ASTs and downloaded registry
+        # rules survive across invocations instead of being re-fetched and
+        # re-parsed by every fresh semgrep process
+        self.cache_dir = os.path.abspath(settings.semgrep_cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Batching state; the queue and consumer task are created lazily on
+        # the first scan because no event loop exists at import time
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+        self._batch_runs: set = set()
+        # Caps in-flight semgrep processes; unlike a worker-thread pool this
+        # costs nothing per waiting scan
+        self._sem = asyncio.Semaphore(settings.max_concurrent_scans)
+        # Completed snippet scans keyed by (code hash, config, rules); CI and
+        # IDE callers re-submit identical snippets, and a hit skips the
+        # subprocess entirely
+        self._scan_cache: "OrderedDict[bytes, ScanResult]" = OrderedDict()
+        self._scan_cache_lock = asyncio.Lock()
+        # Scans currently running, keyed like the result cache; duplicate
+        # concurrent requests await the first run's future instead of
+        # submitting their own
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        # Keeps fire-and-forget cleanup tasks alive until they finish
+        self._cleanup_tasks: set = set()
+
+    def _cleanup_temp_dir(self, temp_dir: str) -> None:
+        """Remove a scan tempdir in the background.
+
+        rmtree unlinks files one by one; doing that inline would stall the
+        event loop for a time proportional to the batch size, and nothing
+        downstream depends on the removal having finished.
+        """
+        task = asyncio.create_task(asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True))
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+
+    @staticmethod
+    def _scan_cache_key(request: ScanRequest) -> bytes:
+        # Language is part of the key: it picks the --lang flag / file
+        # extension and therefore which rules actually run on the code
+        return (
+            hashlib.blake2b(request.code.encode(), digest_size=16).digest()
+            + b"|" + request.language.encode()
+            + b"|" + (request.config or "").encode()
+            + b"|" + ",".join(sorted(request.rules or [])).encode()
+        )
 
-    async def get_version(self) -> str:
-        """Get Semgrep version"""
+    def _cache_env(self, config: Optional[str], rules: Optional[List[str]]) -> Dict[str, str]:
+        """Environment with a per-config semgrep cache folder.
+
+        Each distinct (config, rules) combination gets its own subfolder so
+        cached registry pulls for different rule sets don't collide.
+        """
+        key = f"{config or ''}|{','.join(sorted(rules)) if rules else ''}"
+        subdir = os.path.join(self.cache_dir, hashlib.blake2b(key.encode(), digest_size=8).hexdigest())
+        os.makedirs(subdir, exist_ok=True)
+        return {**os.environ, "SEMGREP_USER_DATA_FOLDER": subdir}
+
+    async def warm_up(self) -> None:
+        """Prime the caches that make the first real scan expensive.
+
+        Runs the version/rules probes and one throwaway snippet scan so the
+        semgrep user-data folder (registry rules, parsed ASTs) is populated
+        at boot instead of on the first user request. Failures are logged
+        and ignored; the service degrades to cold-start behavior.
+        """
         try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._run_command,
-                ["semgrep", "--version"]
-            )
-            return result.stdout.strip()
+            await self.get_version()
+            await self.get_available_rules()
+            await self.scan_code(ScanRequest(code="x = 1\n", language="python", config="auto"))
         except Exception as e:
-            logger.error(f"Failed to get Semgrep version: {e}")
-            return "unknown"
+            logger.warning(f"Semgrep warm-up failed: {e}")
+
+    async def get_version(self) -> str:
+        """Get Semgrep version (cached)"""
+        if self._version_cache and time.monotonic() < self._version_cache[0]:
+            return self._version_cache[1]
+
+        async with self._version_lock:
+            # Re-check: another waiter may have populated the cache while
+            # this coroutine queued on the lock
+            now = time.monotonic()
+            if self._version_cache and now < self._version_cache[0]:
+                return self._version_cache[1]
+
+            try:
+                result = await self._run_command(["semgrep", "--version"])
+                version = result.stdout.strip()
+                self._version_cache = (now + self._VERSION_TTL, version)
+                return version
+            except Exception as e:
+                logger.error(f"Failed to get Semgrep version: {e}")
+                return "unknown"
 
     async def scan_code(self, request: ScanRequest) -> ScanResult:
-        """Scan a single code snippet"""
+        """Scan a single code snippet (batched with concurrent requests)"""
         try:
             if len(request.code) > settings.max_file_size:
                 raise ValueError(f"Code too large: {len(request.code)} bytes")
 
-            ext = self._get_file_extension(request.language)
-            with tempfile.NamedTemporaryFile(mode='w', suffix=f'.{ext}', delete=False) as f:
-                f.write(request.code)
-                temp_file = f.name
-
+            key = self._scan_cache_key(request)
+            async with self._scan_cache_lock:
+                cached = self._scan_cache.get(key)
+                if cached is not None:
+                    self._scan_cache.move_to_end(key)
+                    # Copy so callers can set execution_time without
+                    # mutating the cached instance
+                    return cached.model_copy()
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                # Shielded so a cancelled duplicate can't kill the scan the
+                # original caller is still waiting on
+                result = await asyncio.shield(inflight)
+                return result.model_copy()
+
+            loop = asyncio.get_running_loop()
+            if self._batch_queue is None:
+                self._batch_queue = asyncio.Queue()
+                self._batcher_task = loop.create_task(self._batch_loop())
+
+            future: asyncio.Future = loop.create_future()
+            self._inflight[key] = future
             try:
-                result = await asyncio.get_event_loop().run_in_executor(
-                    self.executor,
-                    self._run_semgrep,
-                    temp_file,
-                    request.config,
-                    request.rules
-                )
-                return result
+                self._batch_queue.put_nowait((request, future))
+                result = await future
             finally:
-                os.unlink(temp_file)
+                self._inflight.pop(key, None)
+
+            # Only clean runs are cached, so a transient semgrep failure
+            # isn't replayed for the cache lifetime
+            if not result.errors:
+                async with self._scan_cache_lock:
+                    self._scan_cache[key] = result.model_copy()
+                    if len(self._scan_cache) > settings.scan_cache_size:
+                        self._scan_cache.popitem(last=False)
+            return result
         except Exception as e:
             logger.error(f"Error scanning code: {e}")
             raise
 
-    async def scan_multiple_files(self, files: List[Dict[str, str]], config: Optional[str] = None) -> ScanResult:
+    async def _batch_loop(self):
+        """Coalesce queued scan requests into shared semgrep invocations.
+
+        Waits for the first request, keeps draining the queue until the
+        batch window closes (or the batch is full), then dispatches one
+        semgrep run per distinct (config, rules) bucket so requests never
+        leak rules into each other.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + self._BATCH_WINDOW
+            while len(batch) < self._BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            buckets: Dict[tuple, list] = {}
+            for request, future in batch:
+                key = (request.config, tuple(sorted(request.rules)) if request.rules else None)
+                buckets.setdefault(key, []).append((request, future))
+
+            for items in buckets.values():
+                # Run buckets as their own tasks so slow scans don't stall
+                # collection of the next batch
+                task = loop.create_task(self._run_batch(items))
+                self._batch_runs.add(task)
+                task.add_done_callback(self._batch_runs.discard)
+
+    async def _run_batch(self, items: list):
+        """Scan one bucket of identically-configured requests together"""
+        if len(items) == 1:
+            request, future = items[0]
+            try:
+                result = await self._scan_one(request)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        config, rules = items[0][0].config, items[0][0].rules
+        temp_dir = tempfile.mkdtemp()
+        try:
+            names = []
+            for i, (request, _) in enumerate(items):
+                name = f"snippet_{i}.{self._get_file_extension(request.language)}"
+                with open(os.path.join(temp_dir, name), 'w') as f:
+                    f.write(request.code)
+                names.append(name)
+
+            jobs = (os.cpu_count() or 4) if len(items) > 8 else 1
+            result = await self._run_semgrep(temp_dir, config, rules, jobs=jobs)
+
+            # Demultiplex the shared run back to each waiter by filename
+            by_name: Dict[str, list] = {}
+            for finding in result.findings:
+                by_name.setdefault(os.path.basename(finding.get("path", "")), []).append(finding)
+
+            for name, (_, future) in zip(names, items):
+                if not future.done():
+                    future.set_result(ScanResult(
+                        findings=by_name.get(name, []),
+                        errors=result.errors,
+                        stats=result.stats
+                    ))
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._cleanup_temp_dir(temp_dir)
+
+    async def _scan_one(self, request: ScanRequest) -> ScanResult:
+        """Scan a single snippet without batching overhead.
+
+        With a known language the code is piped straight to semgrep's stdin,
+        skipping the tempfile write + unlink round-trip; `auto` still needs
+        an on-disk file with a real extension for language detection.
+        """
+        if request.language != "auto":
+            return await self._run_semgrep(
+                "-", request.config, request.rules,
+                stdin_data=request.code.encode(), lang=request.language
+            )
+
+        ext = self._get_file_extension(request.language)
+        with tempfile.NamedTemporaryFile(mode='w', suffix=f'.{ext}', delete=False) as f:
+            f.write(request.code)
+            temp_file = f.name
+
+        try:
+            return await self._run_semgrep(temp_file, request.config, request.rules)
+        finally:
+            os.unlink(temp_file)
+
+    async def scan_multiple_files(self, files: List[Dict[str, Union[str, bytes]]], config: Optional[str] = None) -> ScanResult:
         """Scan multiple files"""
         temp_dir = tempfile.mkdtemp()
         files_created = []
 
         try:
+            # Validate everything and collect unique parent dirs up front,
+            # then fan the writes out concurrently instead of blocking the
+            # event loop on one open+write per file
+            to_write = []
+            parent_dirs = set()
             for file_data in files:
                 filename = file_data["filename"]
                 content = file_data["content"]
+                if isinstance(content, str):
+                    content = content.encode('utf-8')
 
                 if len(content) > settings.max_file_size:
                     raise ValueError(f"File {filename} too large")
 
-                file_path = os.path.join(temp_dir, filename)
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                # Filenames are caller-supplied: refuse anything that could
+                # escape the scan tempdir before it reaches the filesystem
+                parts = PurePosixPath(filename).parts
+                if PurePosixPath(filename).is_absolute() or ".." in parts:
+                    raise ValueError(f"File {filename}: invalid path")
 
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                file_path = os.path.join(temp_dir, filename)
+                parent_dirs.add(os.path.dirname(file_path))
+                to_write.append((file_path, content))
                 files_created.append(filename)
 
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._run_semgrep,
-                temp_dir,
-                config,
-                None
-            )
+            # Shortest-first so parents already exist when their children
+            # are created and makedirs never recurses
+            for parent in sorted(parent_dirs, key=len):
+                os.makedirs(parent, exist_ok=True)
+
+            await asyncio.gather(*(self._write_file(path, content) for path, content in to_write))
+
+            # Worker parallelism only pays for itself on larger batches
+            jobs = (os.cpu_count() or 4) if len(files) > 8 else 1
+            result = await self._run_semgrep(temp_dir, config, None, jobs=jobs)
             result.files_scanned = files_created
             return result
         finally:
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            self._cleanup_temp_dir(temp_dir)
 
-    def _run_semgrep(self, target: str, config: Optional[str], rules: Optional[List[str]]) -> ScanResult:
-        """Run semgrep command"""
+    @staticmethod
+    async def _write_file(path: str, content: bytes) -> None:
+        async with aiofiles.open(path, 'wb') as f:
+            await f.write(content)
+
+    async def _run_semgrep(self, target: str, config: Optional[str], rules: Optional[List[str]],
+                           stdin_data: Optional[bytes] = None, lang: Optional[str] = None,
+                           jobs: int = 1) -> ScanResult:
+        """Run semgrep command; with stdin_data the code is piped instead of read from disk"""
         try:
-            cmd = ["semgrep", "--json", "--no-git-ignore", "--quiet"]
+            # --ast-caching / --registry-caching (experimental engine) reuse
+            # parsed ASTs and downloaded rules from the user-data folder, so
+            # warm runs skip the dominant download + parse cost
+            # --jobs 1 on small inputs skips semgrep's worker-pool setup;
+            # explicit --max-memory and a disabled per-rule timeout keep
+            # semgrep's own defaults from overriding ours (the wall-clock
+            # timeout is enforced on our side)
+            cmd = [
+                "semgrep", "scan", "--experimental", "--json",
+                "--no-git-ignore", "--quiet",
+                "--ast-caching", "--registry-caching",
+                "--jobs", str(jobs),
+                "--max-memory", str(self.max_memory),
+                "--timeout", "0",
+            ]
 
             if config:
                 cmd.extend(["--config", config])
@@ -105,15 +431,44 @@ class SemgrepService:
             else:
                 cmd.extend(["--config", "auto"])
 
+            if stdin_data is not None:
+                cmd.extend(["--lang", lang])
             cmd.append(target)
-            result = self._run_command(cmd)
-
-            if result.returncode == 0 or result.returncode == 1:
+            async with self._sem:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE if stdin_data is not None else None,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=self._cache_env(config, rules)
+                )
+                if stdin_data is not None:
+                    # Queue the payload and close; the transport flushes it
+                    # while we stream stdout below
+                    proc.stdin.write(stdin_data)
+                    proc.stdin.close()
+                # Drain stderr concurrently so a chatty semgrep can't fill
+                # its pipe and deadlock while we're reading stdout
+                stderr_task = asyncio.create_task(proc.stderr.read())
                 try:
-                    output = json.loads(result.stdout) if result.stdout else {}
-                except json.JSONDecodeError:
-                    output = {"results": [], "errors": ["Failed to parse JSON output"]}
-
+                    # Parse stdout incrementally as semgrep emits it: peak
+                    # memory stays at one finding instead of the whole
+                    # serialized output, and parsing overlaps the scan
+                    output = await asyncio.wait_for(
+                        self._parse_semgrep_stream(proc.stdout), timeout=self.timeout
+                    )
+                except ijson.JSONError:
+                    await proc.stdout.read()  # drain so the child can exit
+                    output = {"results": [], "errors": ["Failed to parse JSON output"], "stats": {}}
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    stderr_task.cancel()
+                    raise subprocess.TimeoutExpired(cmd, self.timeout)
+                stderr = await stderr_task
+                await proc.wait()
+
+            if proc.returncode == 0 or proc.returncode == 1:
                 return ScanResult(
                     findings=output.get("results", []),
                     errors=output.get("errors", []),
@@ -122,7 +477,7 @@ class SemgrepService:
             else:
                 return ScanResult(
                     findings=[],
-                    errors=[f"Semgrep error: {result.stderr}"],
+                    errors=[f"Semgrep error: {stderr.decode(errors='replace')}"],
                     stats={}
                 )
         except subprocess.TimeoutExpired:
@@ -138,83 +493,112 @@ class SemgrepService:
                 stats={}
             )
 
-    def _run_command(self, cmd: List[str]) -> subprocess.CompletedProcess:
-        """Run command with timeout"""
-        return subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=self.timeout
-        )
+    # Top-level semgrep output keys routed by the streaming parser: list
+    # items for results/errors, the whole object for stats
+    _STREAM_ITEM_PREFIXES = ("results.item", "errors.item")
+
+    async def _parse_semgrep_stream(self, stream) -> Dict[str, any]:
+        """Incrementally parse semgrep's JSON output from an async stream.
+
+        Routes parser events by prefix so each finding is materialized and
+        appended as soon as its closing brace arrives, never holding more
+        than one finding (plus the small errors/stats sections) in flight.
+        An empty stream (no JSON at all) maps to an empty output rather
+        than a parse error, matching the old json.loads('' or {}) handling.
+        """
+        output = {"results": [], "errors": [], "stats": {}}
+        builder = None
+        builder_prefix = None
+
+        reader = _CountingReader(stream)
+        events = ijson.parse(reader)
+        while True:
+            try:
+                prefix, event, value = await events.__anext__()
+            except StopAsyncIteration:
+                break
+            except ijson.IncompleteJSONError:
+                # Only a stream with no bytes at all maps to an empty
+                # result; non-JSON garbage is a parse error even if it
+                # died before the first event
+                if reader.bytes_read:
+                    raise
+                return output
+
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == builder_prefix and event in ('end_map', 'end_array'):
+                    if builder_prefix == 'stats':
+                        output['stats'] = builder.value
+                    else:
+                        output[builder_prefix.split('.')[0]].append(builder.value)
+                    builder = None
+            elif event in ('start_map', 'start_array') and (
+                    prefix in self._STREAM_ITEM_PREFIXES or prefix == 'stats'):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+                builder_prefix = prefix
+            elif prefix in self._STREAM_ITEM_PREFIXES:
+                # Scalar list entry (e.g. a plain error string)
+                output[prefix.split('.')[0]].append(value)
+
+        return output
+
+    async def _run_command(self, cmd: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+        """Run a command without blocking a thread, bounded by the scan semaphore"""
+        async with self._sem:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                # Reap the process so a timed-out scan doesn't leave a zombie
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, self.timeout)
+            return subprocess.CompletedProcess(
+                cmd,
+                proc.returncode,
+                stdout.decode(errors="replace"),
+                stderr.decode(errors="replace")
+            )
 
     def _get_file_extension(self, language: str) -> str:
         """Map language to file extension"""
-        extensions = {
-            "python": "py",
-            "javascript": "js",
-            "typescript": "ts",
-            "java": "java",
-            "go": "go",
-            "php": "php",
-            "ruby": "rb",
-            "c": "c",
-            "cpp": "cpp",
-            "csharp": "cs",
-            "kotlin": "kt",
-            "rust": "rs",
-            "scala": "scala",
-            "swift": "swift",
-            "auto": "txt"
-        }
-        return extensions.get(language, "txt")
+        return _EXTENSIONS.get(language, "txt")
 
     async def get_available_rules(self) -> List[str]:
-        """Get list of available Semgrep rules with fallback"""
-        try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._run_command,
-                ["semgrep", "--list-configs"]
-            )
+        """Get list of available Semgrep rules with fallback (cached)"""
+        if self._rules_cache and time.monotonic() < self._rules_cache[0]:
+            return self._rules_cache[1]
 
-            if result.returncode == 0 and result.stdout.strip():
-                rules = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                return rules
-            else:
-                logger.warning(f"semgrep --list-configs failed: {result.stderr}")
-                return self._get_fallback_rules()
+        async with self._rules_lock:
+            now = time.monotonic()
+            if self._rules_cache and now < self._rules_cache[0]:
+                return self._rules_cache[1]
 
-        except Exception as e:
-            logger.error(f"Error getting rules: {e}")
-            return self._get_fallback_rules()
+            try:
+                result = await self._run_command(["semgrep", "--list-configs"])
+
+                if result.returncode == 0 and result.stdout.strip():
+                    rules = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                    self._rules_cache = (now + self._RULES_TTL, rules)
+                    return rules
+                else:
+                    logger.warning(f"semgrep --list-configs failed: {result.stderr}")
+                    return self._get_fallback_rules()
+
+            except Exception as e:
+                logger.error(f"Error getting rules: {e}")
+                return self._get_fallback_rules()
 
     def _get_fallback_rules(self) -> List[str]:
         """Fallback list of popular/known rules"""
-        return [
-            "auto",
-            "p/security-audit",
-            "p/owasp-top-ten",
-            "p/cwe-top-25",
-            "p/python",
-            "p/javascript",
-            "p/typescript",
-            "p/java",
-            "p/go",
-            "p/php",
-            "p/ruby",
-            "p/c",
-            "p/cpp",
-            "p/csharp",
-            "p/kotlin",
-            "p/rust",
-            "p/scala",
-            "p/swift",
-            "r/python.django.security",
-            "r/python.flask.security",
-            "r/javascript.express.security",
-            "r/javascript.node-js.security",
-            "r/java.spring.security"
-        ]
+        return list(_FALLBACK_RULES)
 
     async def test_rule_config(self, config: str) -> Dict[str, any]:
         """Test if a rule configuration is working"""
@@ -233,13 +617,7 @@ subprocess.call("rm file", shell=True)
                 temp_file = f.name
 
             try:
-                result = await asyncio.get_event_loop().run_in_executor(
-                    self.executor,
-                    self._run_semgrep,
-                    temp_file,
-                    config,
-                    None
-                )
+                result = await self._run_semgrep(temp_file, config, None)
 
                 return {
                     "config": config,
@@ -260,39 +638,27 @@ subprocess.call("rm file", shell=True)
             }
 
     async def get_custom_rules_info(self) -> List[Dict[str, any]]:
-        """Get information about custom rules files"""
-        custom_rules = []
-        custom_dir = "rules/custom"
+        """Get information about custom rules files.
 
-        if not os.path.exists(custom_dir):
-            return custom_rules
+        Built on the shared rules cache: the directory listing is reused
+        until the directory mtime moves, and per-file rule counts come from
+        a byte-level scan cached on each file's stat signature, so the
+        unchanged-files case costs one stat instead of re-reading YAML.
+        """
+        custom_rules = []
 
         try:
-            for filename in os.listdir(custom_dir):
-                if filename.endswith(('.yml', '.yaml')):
-                    filepath = os.path.join(custom_dir, filename)
-
-                    try:
-                        stat = os.stat(filepath)
-
-                        rule_count = 0
-                        try:
-                            with open(filepath, 'r') as f:
-                                content = f.read()
-                                rule_count = content.count('- id:')
-                        except:
-                            rule_count = 0
-
-                        custom_rules.append({
-                            "filename": filename,
-                            "path": f"rules/custom/{filename}",
-                            "size": stat.st_size,
-                            "modified": stat.st_mtime,
-                            "rule_count": rule_count
-                        })
-
-                    except Exception as e:
-                        logger.warning(f"Error reading custom rule file {filename}: {e}")
+            for filename, path, stat in rules_cache.snapshot("rules/custom"):
+                try:
+                    custom_rules.append({
+                        "filename": filename,
+                        "path": f"rules/custom/{filename}",
+                        "size": stat.st_size,
+                        "modified": stat.st_mtime,
+                        "rule_count": rules_cache.rule_count(path, stat)
+                    })
+                except Exception as e:
+                    logger.warning(f"Error reading custom rule file {filename}: {e}")
 
         except Exception as e:
             logger.error(f"Error scanning custom rules directory: {e}")